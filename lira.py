@@ -1,14 +1,29 @@
+import os
 import re
+import gzip
 import json
+import time
+import hashlib
 import logging
 import argparse
-import webbrowser
+import tempfile
+import threading
+from html import escape
 from pathlib import Path
-from typing import Dict, List
-from datetime import datetime, timedelta
-from itertools import product
-import requests
-from pymed import PubMed
+from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple
+from datetime import date, datetime, timedelta
+from xml.etree import ElementTree
+from functools import lru_cache
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+if TYPE_CHECKING:
+    import requests  # imported when needed (see get_http_session), so that e.g. --last and --help start faster
+
+# Optional dependencies
+try:
+    import orjson  # faster JSON parsing and serialization
+except ImportError:
+    orjson = None
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -21,11 +36,38 @@ logger.addHandler(handler)
 # Macros definition
 CONFIG_FOLDER = Path("config")
 DEFAULT_CONFIG_FILE = CONFIG_FOLDER / Path("config.json")
+TEMPLATE_HTML = Path("in") / Path("template.html")
 OUT_FOLDER = Path("out")
 OUT_HTML = OUT_FOLDER / Path("lira_output.html")
 DEFAULT_PYMED_MAX_RESULTS = 500
 DATE_FORMAT = "%Y/%m/%d"
 OUT_JSON = OUT_FOLDER / Path("lira_output.json")
+OUT_BUFFER_SIZE = 1 << 16  # size of the buffer used to stream the HTML report to file
+EUTILS_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+PUBMED_ARTICLE_URL = "https://pubmed.ncbi.nlm.nih.gov/"  # base url of the PubMed page of each article
+EFETCH_BATCH_SIZE = 500  # max number of articles retrieved by each EFetch request
+EFETCH_MAX_WORKERS = 3  # max number of EFetch requests running concurrently for a single query
+NCBI_RATE_LIMIT = 3  # max requests per second to NCBI without an API key
+NCBI_RATE_LIMIT_WITH_KEY = 10  # max requests per second to NCBI with an API key
+HTTP_MAX_RETRIES = 3  # max number of retries for failed requests
+HTTP_POOL_MAXSIZE = 10  # max number of connections kept alive for each host
+HTTP_TIMEOUT = (3.05, 60)  # connect and read timeouts (in seconds) for each request
+CACHE_FOLDER = OUT_FOLDER / Path("cache")
+DEFAULT_CACHE_TTL_HOURS = 24  # hours after which a cached query result is considered outdated
+DAYS_AGO_REGEX = re.compile(r'\s*(\d+)\s+days?\s+ago\s')  # matches the 'n days ago' prefix of Google Scholar snippets
+NO_TITLE = "No title found"  # title used for the results without one
+NON_ALPHANUMERIC_REGEX = re.compile(r"[\W_]+")  # matches the characters ignored when comparing titles
+GS_MAX_QUERY_LENGTH = 255  # max length of each query to Google Scholar
+GS_MAX_WORKERS = 3  # max number of Google Scholar query chunks running concurrently for a single query
+GS_NO_RESULTS_ERROR = "hasn't returned any results"  # part of the SerpAPI error sent for queries without results
+GS_REMOVE_PARENTHESES = str.maketrans("", "", "()")  # translation table removing parentheses from GS queries
+GS_OPERATORS_REGEX = re.compile(r"\s*\b(AND|OR)\b\s*|\bNOT\s+")  # matches the boolean operators in a query
+GS_OPERATORS = {"AND": " ", "OR": "|", "NOT": "-"}  # Google Scholar equivalent of each boolean operator
+PAPER_HTML_TEMPLATE = ('<p class="lorem" style="font-size: larger;"><strong>%(title)s</strong></p>\n'
+                       '<p class="lorem">%(authors)s<br>\n'
+                       '<a href="%(link)s"> %(link)s</a><br>\n'
+                       '%(abstract)s</p>\n'
+                       '<hr class="lorem">\n')
 
 
 def parse_cli_args() -> argparse.Namespace:
@@ -36,7 +78,7 @@ def parse_cli_args() -> argparse.Namespace:
     """
     # init parser
     parser = argparse.ArgumentParser(description="LiRA: Literature Review Automated. "
-                                                 "Based on pymed to query PubMed programmatically.")
+                                                 "Based on the NCBI E-utilities to query PubMed programmatically.")
 
     # add mutually exclusive group for arguments
     group = parser.add_mutually_exclusive_group(required=True)
@@ -63,6 +105,11 @@ def parse_cli_args() -> argparse.Namespace:
                         help="Define a configuration file to use instead of the "
                              "default config.json.")
 
+    # add option to ignore cached results
+    parser.add_argument("--no-cache",
+                        action='store_true',
+                        help="Do not use the results cached by previous runs and query the engines again")
+
     # add option for silence
     parser.add_argument("--quiet", "-q",
                         action='store_true',
@@ -92,6 +139,33 @@ def parse_cli_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+def json_loads(data: bytes):
+    """
+    Parse JSON data with orjson, if installed, else with the json module.
+
+    :param data: JSON document
+    :return: parsed object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    else:
+        return json.loads(data)
+
+
+def json_dumps(obj, indent: bool = False) -> bytes:
+    """
+    Serialize an object to JSON with orjson, if installed, else with the json module.
+
+    :param obj: object to serialize
+    :param indent: if True, indent the JSON document with 2 spaces (for human readers); else, make it compact
+    :return: JSON document, as UTF-8 bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    else:
+        return json.dumps(obj, indent=2 if indent else None).encode()
+
+
 def read_config(args: argparse.Namespace) -> Dict:
     """
     Read configuration file
@@ -105,39 +179,394 @@ def read_config(args: argparse.Namespace) -> Dict:
     else:
         config_file = Path(args.config)
 
-    # read config file
-    with open(config_file, "r") as infile:
-        config = json.load(infile)
+    return load_config_file(config_file)
+
+
+@lru_cache(maxsize=None)
+def load_config_file(config_file: Path) -> Dict:
+    """
+    Load a configuration file. The file is parsed once, and then shared by the engines and the output generator,
+    which must not modify it.
+
+    :param config_file: path to the configuration file
+    :return: configuration dict
+    """
+    with open(config_file, "rb") as infile:
+        config = json_loads(infile.read())
 
     return config
 
 
+def get_initial_date(args: argparse.Namespace) -> str:
+    """
+    Get the initial date of the search, i.e. the date given with --from-date or the date --for-weeks weeks ago.
+
+    :param args: CLI arguments
+    :return: initial date, as a string in DATE_FORMAT
+    """
+    if args.from_date is None:
+        initial_date = datetime.now() - timedelta(weeks=args.for_weeks)
+        return initial_date.strftime(DATE_FORMAT)
+    else:
+        return args.from_date
+
+
+def get_max_results_for_query(args: argparse.Namespace) -> int:
+    """
+    Get the max number of results for each query, i.e. the value given with --max-results-for-query or the default.
+
+    :param args: CLI arguments
+    :return: max results for query
+    """
+    if args.max_results_for_query is None:
+        return DEFAULT_PYMED_MAX_RESULTS
+    else:
+        return args.max_results_for_query
+
+
+@lru_cache(maxsize=1)
+def get_http_session() -> "requests.Session":
+    """
+    Get the http session shared by all the requests to NCBI and SerpAPI. It keeps the connections alive across
+    requests and retries the ones failing with transient errors (including POST requests, which LiRA only uses for
+    read-only EFetch queries). When the retries run out, the last response is returned, so that the callers can
+    handle it (e.g. the SerpAPI error message sent with a 429 when the searches of the account run out).
+
+    :return: requests session
+    """
+    # import the http libraries only when the engines are actually queried
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    retries = Retry(total=HTTP_MAX_RETRIES, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods=None, raise_on_status=False)
+    session.mount("https://", HTTPAdapter(pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retries))
+    return session
+
+
+class RateLimiter:
+    """
+    Thread-safe rate limiter. Spaces the requests so that at most `rate` requests per second are started, even when
+    they are made by concurrent threads.
+    """
+    def __init__(self, rate: float):
+        self.interval = 1. / rate
+        self._lock = threading.Lock()
+        self._next_request_time = 0.
+
+    def wait(self) -> None:
+        """
+        Block until a new request can be started
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_request_time - now
+            self._next_request_time = max(now, self._next_request_time) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+class PubMedClient:
+    """
+    Minimal client for the NCBI E-utilities. Searches PubMed with ESearch, retrieves the articles with EFetch and
+    parses them with ElementTree.iterparse, so that only the fields needed by LiRA are extracted, one article at a time.
+    It can be shared by concurrent queries, since all requests wait for a common, thread-safe, RateLimiter, and each
+    article is retrieved only once, even when it is returned by more than one query.
+    """
+    def __init__(self, tool: str, email: str, api_key: str, rate_limiter: RateLimiter):
+        # define default parameters for each request
+        self.parameters = {"tool": tool, "email": email, "db": "pubmed"}
+        if api_key:
+            self.parameters["api_key"] = api_key
+
+        # store rate limiter
+        self.rate_limiter = rate_limiter
+
+        # get the shared http session, so that all the requests to NCBI reuse the same connections
+        self.session = get_http_session()
+
+        # init the articles retrieved (or being retrieved) by the client, as futures indexed by PubMed ID
+        self._articles: Dict[str, Future] = {}
+        self._articles_lock = threading.Lock()
+
+    def _post(self, endpoint: str, parameters: Dict, stream: bool = False) -> "requests.Response":
+        # wait for rate limit
+        self.rate_limiter.wait()
+
+        # make request, sending the parameters in the body (recommended by NCBI for long queries and lists of IDs)
+        response = self.session.post(f"{EUTILS_BASE_URL}/{endpoint}", data={**self.parameters, **parameters},
+                                     stream=stream, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+
+        return response
+
+    def search(self, query: str, max_results: int) -> Tuple[List[str], int]:
+        """
+        Get the PubMed IDs of the results of a query with ESearch. The query is sent with POST requests, so that
+        queries combining many journals or authors do not exceed the max URL length.
+
+        :param query: PubMed query
+        :param max_results: max number of IDs to retrieve
+        :return: tuple (list of PubMed IDs, total number of results for the query)
+        """
+        article_ids = []
+        n_tot_results = max_results
+        while len(article_ids) < min(n_tot_results, max_results):
+            response = self._post("esearch.fcgi", {"term": query,
+                                                   "retstart": len(article_ids),
+                                                   "retmax": max_results - len(article_ids),
+                                                   "retmode": "json"})
+            esearch_result = json_loads(response.content)["esearchresult"]
+            n_tot_results = int(esearch_result["count"])
+            if len(esearch_result["idlist"]) == 0:
+                break
+            article_ids.extend(esearch_result["idlist"])
+
+        return article_ids, n_tot_results
+
+    @staticmethod
+    def _get_text(element: ElementTree.Element) -> str:
+        # get the full text of the element, including the text in nested tags (e.g. <i>)
+        return None if element is None else "".join(element.itertext())
+
+    def _parse_article(self, article: ElementTree.Element) -> Dict:
+        """
+        Extract the fields used by LiRA from a PubmedArticle XML element.
+
+        :param article: PubmedArticle element
+        :return: dict with the article pubmed_id, title, abstract, journal, journal_abbreviation, doi,
+            publication_date, and authors (as dicts with lastname and firstname)
+        """
+        # get authors
+        authors = []
+        for author in article.iterfind("MedlineCitation/Article/AuthorList/Author"):
+            if author.find("LastName") is not None:
+                authors.append({"lastname": author.findtext("LastName"), "firstname": author.findtext("ForeName")})
+            else:
+                authors.append({"lastname": author.findtext("CollectiveName"), "firstname": None})
+
+        # get publication date, i.e. the date in which the article was added to PubMed
+        pubmed_date = article.find("PubmedData/History/PubMedPubDate[@PubStatus='pubmed']")
+        try:
+            publication_date = date(year=int(pubmed_date.findtext("Year")),
+                                    month=int(pubmed_date.findtext("Month", "1")),
+                                    day=int(pubmed_date.findtext("Day", "1")))
+        except (AttributeError, TypeError, ValueError):
+            publication_date = None
+
+        # get abstract
+        abstract_texts = [self._get_text(a) for a in article.iterfind("MedlineCitation/Article/Abstract/AbstractText")]
+
+        return {
+            "pubmed_id": article.findtext("MedlineCitation/PMID"),
+            "title": self._get_text(article.find("MedlineCitation/Article/ArticleTitle")),
+            "abstract": "\n".join(abstract_texts) if len(abstract_texts) > 0 else None,
+            "journal": article.findtext("MedlineCitation/Article/Journal/Title"),
+            "journal_abbreviation": article.findtext("MedlineCitation/MedlineJournalInfo/MedlineTA"),
+            "doi": article.findtext("PubmedData/ArticleIdList/ArticleId[@IdType='doi']"),
+            "publication_date": publication_date,
+            "authors": authors
+        }
+
+    def _fetch_batch(self, article_ids: List[str]) -> List[Dict]:
+        """
+        Retrieve a batch of articles with EFetch. The IDs are sent with a POST request, so that large batches do not
+        exceed the max URL length, and the articles are parsed directly from the response stream, so that each article
+        is parsed as soon as it is downloaded and the full response is never held in memory.
+
+        :param article_ids: list of PubMed IDs
+        :return: list of articles, as dicts (see _parse_article)
+        """
+        # init output list
+        articles = []
+
+        with self._post("efetch.fcgi", {"id": ",".join(article_ids), "retmode": "xml"}, stream=True) as response:
+            # decompress the stream, if needed
+            response.raw.decode_content = True
+            # parse one article at a time, detaching each one from the root once parsed, so that the parsed
+            # articles are freed and the tree never grows beyond a single article
+            root = None
+            for event, element in ElementTree.iterparse(response.raw, events=("start", "end")):
+                if root is None:
+                    root = element
+                elif (event == "end") and (element.tag == "PubmedArticle"):
+                    articles.append(self._parse_article(element))
+                    root.clear()
+
+        return articles
+
+    def _fetch_batches(self, article_ids: List[str]) -> Iterator[Dict]:
+        """
+        Retrieve the articles with EFetch, in batches of EFETCH_BATCH_SIZE articles (see _fetch_batch). The batches
+        are requested concurrently (still within the rate limit), each one downloaded and parsed by its own worker, so
+        that at most EFETCH_MAX_WORKERS responses are open at the same time.
+
+        :param article_ids: list of PubMed IDs
+        :return: iterator over the articles, as dicts (see _parse_article), in the order of the batches
+        """
+        # split ids in batches
+        batches = [article_ids[i:i + EFETCH_BATCH_SIZE] for i in range(0, len(article_ids), EFETCH_BATCH_SIZE)]
+        if len(batches) == 0:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(len(batches), EFETCH_MAX_WORKERS)) as executor:
+            for articles in executor.map(self._fetch_batch, batches):
+                yield from articles
+
+    def fetch(self, article_ids: List[str]) -> Iterator[Dict]:
+        """
+        Retrieve the articles with EFetch (see _fetch_batches). The articles already retrieved by previous queries, or
+        being retrieved by concurrent queries, are not requested again: they are taken from (or waited for) the
+        articles of the client.
+
+        :param article_ids: list of PubMed IDs
+        :return: iterator over the articles, as dicts (see _parse_article)
+        """
+        # claim the articles which were never requested
+        new_article_ids = []
+        with self._articles_lock:
+            for article_id in article_ids:
+                if article_id not in self._articles:
+                    self._articles[article_id] = Future()
+                    new_article_ids.append(article_id)
+            futures = [self._articles[article_id] for article_id in article_ids]
+            # get the futures of the claimed articles, which are resolved only by this call
+            new_futures = {article_id: self._articles[article_id] for article_id in new_article_ids}
+
+        # retrieve the claimed articles, ignoring any other article returned by EFetch (which could be claimed by a
+        # concurrent query)
+        try:
+            for article in self._fetch_batches(new_article_ids):
+                future = new_futures.get(article["pubmed_id"])
+                if (future is not None) and (not future.done()):
+                    future.set_result(article)
+        except Exception as e:
+            # release the claimed articles, so that they can be requested again by other queries
+            with self._articles_lock:
+                for article_id, future in new_futures.items():
+                    del self._articles[article_id]
+                    if not future.done():
+                        future.set_exception(e)
+            raise
+        # set as missing the articles which were not returned by EFetch
+        for future in new_futures.values():
+            if not future.done():
+                future.set_result(None)
+
+        # yield all articles, in the same order as the ids
+        for future in futures:
+            article = future.result()
+            if article is not None:
+                yield article
+
+    def query(self, query: str, max_results: int) -> Tuple[Iterator[Dict], int]:
+        """
+        Search PubMed and retrieve the resulting articles.
+
+        :param query: PubMed query
+        :param max_results: max number of articles to retrieve
+        :return: tuple (iterator over the articles, as dicts (see _parse_article), total number of results for the
+            query, as reported by ESearch)
+        """
+        article_ids, n_tot_results = self.search(query, max_results)
+        return self.fetch(article_ids), n_tot_results
+
+
+class ResultsCache:
+    """
+    Cache for query results. Results are stored on disk as gzipped JSON files, named after the hash of the query, and
+    kept in memory for the rest of the run. Results older than `ttl` seconds are considered outdated.
+    """
+    def __init__(self, cache_folder: Path = CACHE_FOLDER, ttl: float = DEFAULT_CACHE_TTL_HOURS * 3600):
+        self.cache_folder = cache_folder
+        self.ttl = ttl
+        self._memory_cache: Dict[str, List] = {}
+
+    def _get_key(self, *args) -> str:
+        key_string = "\n".join(str(a) for a in args)
+        return hashlib.blake2b(key_string.encode(), digest_size=16).hexdigest()
+
+    def get(self, *args) -> List:
+        """
+        Get the cached results for the given arguments (e.g. engine name, query, max results)
+
+        :param args: arguments identifying the query
+        :return: cached results, or None if the results are not cached or the cache is outdated
+        """
+        key = self._get_key(*args)
+
+        # check memory first
+        if key in self._memory_cache:
+            return self._memory_cache[key]
+
+        # then check disk
+        cache_file = self.cache_folder / Path(f"{key}.json.gz")
+        if cache_file.exists() and (time.time() - cache_file.stat().st_mtime) < self.ttl:
+            # treat unreadable files (e.g. corrupted) as a cache miss, so that the query is run again
+            try:
+                with gzip.open(cache_file, "rb") as infile:
+                    results = json_loads(infile.read())
+            except (OSError, EOFError, ValueError) as e:
+                logger.warning("Ignoring unreadable cache file %s: %s", cache_file, e)
+                return None
+            self._memory_cache[key] = results
+            return results
+
+        return None
+
+    def set(self, results: List, *args) -> None:
+        """
+        Cache the results for the given arguments
+
+        :param results: results to cache. Must be JSON serializable.
+        :param args: arguments identifying the query
+        """
+        key = self._get_key(*args)
+        self._memory_cache[key] = results
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first and then move it in place, so that an interrupted run never leaves a
+        # truncated cache file behind
+        tmp_fd, tmp_file = tempfile.mkstemp(suffix=".tmp", dir=self.cache_folder)
+        try:
+            with os.fdopen(tmp_fd, "wb") as tmp_outfile, gzip.GzipFile(fileobj=tmp_outfile, mode="wb") as outfile:
+                outfile.write(json_dumps(results))
+            os.replace(tmp_file, self.cache_folder / Path(f"{key}.json.gz"))
+        except BaseException:
+            os.remove(tmp_file)
+            raise
+
+
 class EnginePipeline:
-    def __init__(self, cli_args: argparse.Namespace):
+    def __init__(self, cli_args: argparse.Namespace, config: Dict, initial_date: str):
         # save args
         self.cli_args = cli_args
 
+        # number of queries which can run concurrently (by default, one for each search)
+        self.max_workers = 3
+
         # get max results for search
-        if cli_args.max_results_for_query is None:
-            self.max_results_for_query = DEFAULT_PYMED_MAX_RESULTS
-        else:
-            self.max_results_for_query = cli_args.max_results_for_query
+        self.max_results_for_query = get_max_results_for_query(cli_args)
 
-        # get initial date
-        if cli_args.from_date is None:
-            initial_date = datetime.now() - timedelta(weeks=cli_args.for_weeks)
-            self.initial_date = initial_date.strftime(DATE_FORMAT)
-        else:
-            self.initial_date = cli_args.from_date
+        # store initial date (computed once for all the engines), also as datetime for date arithmetic
+        self.initial_date = initial_date
+        self.initial_date_dt = datetime.strptime(initial_date, DATE_FORMAT)
+
+        # get current date once, so that all the searches of the engine share the same time reference
+        self.now = datetime.now()
+        self.today = self.now.date().isoformat()  # part of the cache keys, since the results change every day
 
-        # read config
-        self.config = read_config(cli_args)
+        # store config (read once for all the engines)
+        self.config = config
 
-        # get common propreties
-        self.keywords = self.config["keywords"]
-        self.journals = self.config["journals"]
-        self.authors = self.config["authors"]
-        self.highlight_authors = self.config["highlight_authors"] + self.authors
+        # init results cache, with the time to live in the config (if any)
+        self.cache = ResultsCache(ttl=self.config.get("cache_ttl_hours", DEFAULT_CACHE_TTL_HOURS) * 3600)
+
+        # get common propreties, dropping duplicated entries (which would be searched twice)
+        self.keywords = list(dict.fromkeys(self.config["keywords"]))
+        self.journals = list(dict.fromkeys(self.config["journals"]))
+        self.authors = list(dict.fromkeys(self.config["authors"]))
 
     def article_dict(self,
                      authors: List[str],
@@ -163,10 +592,10 @@ class EnginePipeline:
 
 class PubMedPipeline(EnginePipeline):
     """
-    Pipeline for PubMed. Uses PyMed as backend.
+    Pipeline for PubMed. Uses the NCBI E-utilities as backend.
     """
-    def __init__(self, cli_args: argparse.Namespace):
-        super().__init__(cli_args)
+    def __init__(self, cli_args: argparse.Namespace, config: Dict, initial_date: str):
+        super().__init__(cli_args, config, initial_date)
 
         # set name
         self.name = "pubmed"
@@ -174,21 +603,69 @@ class PubMedPipeline(EnginePipeline):
         # load email
         self.email = self.config["email"]
 
-        # init pymed
-        self.pubmed = PubMed(tool="LiRA", email=self.email)
+        # load NCBI API key (optional)
+        self.ncbi_api_key = self.config.get("ncbi_api_key", "")
 
-    def _add_keywords_to_query(self, query: str):
-        keywords_query = " OR ".join([f"({keyword})" for keyword in self.keywords])
-        query += f" AND ({keywords_query})"
-        return query
+        # init PubMed client, shared by the concurrent searches under a common rate limit
+        rate_limit = NCBI_RATE_LIMIT_WITH_KEY if self.ncbi_api_key else NCBI_RATE_LIMIT
+        self.pubmed = PubMedClient(tool="LiRA", email=self.email, api_key=self.ncbi_api_key,
+                                   rate_limiter=RateLimiter(rate_limit))
 
-    def make_query(self, query: str):
-        logger.info(f"Running PubMed query (max res: {self.max_results_for_query}): {query}")
+        # build the date and keywords parts of the queries once, since they are the same for all searches
+        self.date_query = f'(("{self.initial_date}"[Date - Create] : "3000"[Date - Create]))'
+        self.keywords_query = " OR ".join(f"({keyword})" for keyword in self.keywords)
 
-        results = self.pubmed.query(query, max_results=self.max_results_for_query)
+    def _build_query(self, *clauses: str, add_keywords: bool = False) -> str:
+        """
+        Build a PubMed query for the articles created from the initial date and matching all the given clauses.
+
+        :param clauses: query clauses (e.g. an OR of journals)
+        :param add_keywords: if True, also require the articles to match the keywords
+        :return: query
+        """
+        query_parts = [self.date_query]
+        query_parts.extend(f"({clause})" for clause in clauses)
+        if add_keywords:
+            query_parts.append(f"({self.keywords_query})")
+        return " AND ".join(query_parts)
+
+    def make_query(self, query: str, max_results: int = None):
+        # get max results for the query
+        if max_results is None:
+            max_results = self.max_results_for_query
+
+        logger.info("Running PubMed query (max res: %s): %s", max_results, query)
+
+        results, n_tot_results = self.pubmed.query(query, max_results=max_results)
+
+        return results, n_tot_results
+
+    def _match_journal(self, article: Dict) -> str:
+        """
+        Given a PubMed article, return the corresponding journal in the configuration file.
+        PubMed returns the full journal title (e.g. 'bioRxiv : the preprint server for biology') and its MEDLINE
+        abbreviation (e.g. 'N Engl J Med'), so the journal is matched case-insensitively, first exactly with either
+        of them and then as a prefix of the title.
+
+        :param article: article, as returned by PubMedClient
+        :return: the matching journal in the configuration file, or the article journal if none matches
+        """
+        if article["journal"] is None:
+            return None
+
+        article_journal_lower = article["journal"].lower()
+        article_journal_abbreviation_lower = str(article["journal_abbreviation"]).lower()
+        # look for an exact match, with the title first and then with the abbreviation
+        for article_journal_name in (article_journal_lower, article_journal_abbreviation_lower):
+            for journal in self.journals:
+                if journal.lower() == article_journal_name:
+                    return journal
+        # else, get the longest configured journal which is a prefix of the article journal
+        candidates = [journal for journal in self.journals if article_journal_lower.startswith(journal.lower())]
+        if len(candidates) > 0:
+            return max(candidates, key=len)
+        return article["journal"]
 
-        return results
-    
     def _get_output_list_from_results(self, results, **kwargs):
         # init output list
         output_list = []
@@ -196,70 +673,75 @@ class PubMedPipeline(EnginePipeline):
         # generate list of results
         for article in results:
             # get authors
-            if len(article.authors) > 0:
-                authors_list = [f"{a['lastname']}, {a['firstname']}" for a in article.authors]
+            if len(article["authors"]) > 0:
+                authors_list = [f"{a['lastname']}, {a['firstname']}" for a in article["authors"]]
             else:
                 authors_list = [None]
-            # get article_id
-            article_id = str(article.pubmed_id).split("\n")[0]
-            # get article doi
-            article_doi = None if article.doi is None else article.doi.split('\n', maxsplit=1)[0]
             # generate dict
             article_dict = self.article_dict(
                 authors=authors_list,
-                title=article.title,
-                link=f'https://pubmed.ncbi.nlm.nih.gov/{article_id}</a><br>',
-                abstract=article.abstract,
-                doi=article_doi,
-                journal=article.journal if 'journal' not in kwargs else kwargs['journal'],
-                date=article.publication_date.strftime(DATE_FORMAT) if article.publication_date is not None else None
+                title=article["title"],
+                link=f'{PUBMED_ARTICLE_URL}{article["pubmed_id"]}/',
+                abstract=article["abstract"],
+                doi=article["doi"],
+                journal=self._match_journal(article) if kwargs.get('match_journal') else article["journal"],
+                date=article["publication_date"].strftime(DATE_FORMAT) if article["publication_date"] is not None else None
             )
             # append to output list
             output_list.append(article_dict)
-
-        # check number of results
-        n_results = len(output_list)
-        if n_results >= self.max_results_for_query:
-            logger.warning(f"Number of paper published might exceed {self.max_results_for_query}. "
-                           f"Consider changing the max results for query using the flag "
-                           f"'--max_results_for_query'.")
-        logger.info(f"Found {n_results} results")
             
         return output_list
+
+    def _get_output_list_from_query(self, query: str, max_results: int = None, **kwargs):
+        # get max results for the query
+        if max_results is None:
+            max_results = self.max_results_for_query
+
+        # check if the results for the query are cached
+        if not self.cli_args.no_cache:
+            output_list = self.cache.get(self.name, query, max_results, self.today)
+            if output_list is not None:
+                logger.info("Using cached results (%s) for PubMed query: %s", len(output_list), query)
+                return output_list
+
+        # make query
+        results, n_tot_results = self.make_query(query, max_results=max_results)
+
+        # check number of results before retrieving the articles (the results are retrieved lazily); warn if ESearch
+        # reported more results than the max results for the query
+        if n_tot_results > max_results:
+            logger.warning("PubMed has %s results, but only the first %s will be retrieved. "
+                           "Consider changing the max results for query using the flag "
+                           "'--max-results-for-query'.", n_tot_results, max_results)
+
+        # get output list and cache it
+        output_list = self._get_output_list_from_results(results, **kwargs)
+        self.cache.set(output_list, self.name, query, max_results, self.today)
+        logger.info("Found %s results", len(output_list))
+
+        return output_list
     
     def search_for_keywords(self):
-        # init query with date
-        query = f'(("{self.initial_date}"[Date - Create] : "3000"[Date - Create]))'
-        # add keywords to the query
-        query = self._add_keywords_to_query(query)
-        # make query
-        results = self.make_query(query)
-        return self._get_output_list_from_results(results)
+        # build query with date and keywords
+        query = self._build_query(add_keywords=True)
+        # get output list
+        return self._get_output_list_from_query(query)
     
     def search_for_journals(self):
-        # init output list
-        output_list = []
-
         # check number of journals
         if len(self.journals) == 0:
             logger.info("No Journals found")
+            return []
         else:
-            # iterate on journals
-            for journal in self.journals:
-                # init query with date and journal
-                query = f'(("{self.initial_date}"[Date - Create] : "3000"[Date - Create])) AND ({journal}[Journal])'
+            # build query with date and all the journals, so that a single query is run for all of them, adding the
+            # keywords if necessary
+            all_journals = " OR ".join(f"({journal}[Journal])" for journal in self.journals)
+            query = self._build_query(all_journals, add_keywords=self.cli_args.filter_journals)
 
-                # if necessary, add keywords to the query
-                if self.cli_args.filter_journals:
-                    query = self._add_keywords_to_query(query)
-
-                # run query for journal
-                results = self.make_query(query)
-
-                # get output list
-                output_list.extend(self._get_output_list_from_results(results, journal=journal))
-        
-        return output_list
+            # run query for all journals, allowing max results for each journal, and get output list,
+            # assigning each article to its journal
+            max_results = self.max_results_for_query * len(self.journals)
+            return self._get_output_list_from_query(query, max_results=max_results, match_journal=True)
 
     def search_for_authors(self):
         # init output list
@@ -270,20 +752,14 @@ class PubMedPipeline(EnginePipeline):
             logger.info("No authors found.")
             return output_list
         else:
-            # init authors query
-            query = f'(("{self.initial_date}"[Date - Create] : "3000"[Date - Create]))'
-            all_authors = " OR ".join([f"({author.replace(',', '')}[Author])" for author in self.authors])
-            query = f"{query} AND ({all_authors})"
-
-            # if necessary, filter authors
-            if self.cli_args.filter_authors:
-                query = self._add_keywords_to_query(query)
+            # build query with date and all the authors, adding the keywords if necessary
+            all_authors = " OR ".join(f"({author.replace(',', '')}[Author])" for author in self.authors)
+            query = self._build_query(all_authors, add_keywords=self.cli_args.filter_authors)
 
-            # make query
-            results = self.make_query(query)
-
-            # append results to output list
-            output_list.extend(self._get_output_list_from_results(results))
+            # make a single query for all authors, allowing max results for each author, and append results to
+            # output list
+            max_results = self.max_results_for_query * len(self.authors)
+            output_list.extend(self._get_output_list_from_query(query, max_results=max_results))
 
         return output_list
 
@@ -291,18 +767,21 @@ class GoogleScholarPipeline(EnginePipeline):
     """
     Pipeline for Google Scholar. Uses SerpAPI as backend.
     """
-    def __init__(self, cli_args: argparse.Namespace):
-        super().__init__(cli_args)
+    def __init__(self, cli_args: argparse.Namespace, config: Dict, initial_date: str):
+        super().__init__(cli_args, config, initial_date)
         # set name
         self.name = "google_scholar"
 
         # get time delta between now and initial date
-        time_range: timedelta = datetime.now() - datetime.strptime(self.initial_date, DATE_FORMAT)
+        time_range: timedelta = self.now - self.initial_date_dt
         self.timedelta_days = time_range.days
 
         # get serpapi key
         self.serpapi_key = self.config["serpapi_key"]
 
+        # get the shared http session, so that all the requests to SerpAPI reuse the same connections
+        self.session = get_http_session()
+
         # create base url for google scholar
         self.gs_base_url = "https://serpapi.com/search?engine=google_scholar"
 
@@ -313,6 +792,9 @@ class GoogleScholarPipeline(EnginePipeline):
             "num": self.max_results_for_query
         }
 
+        # build the keywords part of the queries once, since it is the same for all searches
+        self.keywords_query = self._get_keywords_query()
+
     def _get_days_ago_for_gs_organic_result(self, organic_result: Dict):
         """
         Given a Google Scholar organic result, return how many days ago it was published.
@@ -320,131 +802,206 @@ class GoogleScholarPipeline(EnginePipeline):
         :param organic_result: Google Scholar organic result as provided by SerpAPI
         :return:
         """
+        # the result is parsed both while paginating and while building the output, so it is stored in the result
+        if "_days_ago" in organic_result:
+            return organic_result["_days_ago"]
+
         snippet = organic_result["snippet"]
-        try:
-            days_ago = int(re.split(r'\s+day(s)?\s+ago+\s', snippet)[0])
-        except ValueError as e:
-            logger.warning(f"Error while parsing snippet: {snippet}, setting days ago to 0")
+        days_ago_match = DAYS_AGO_REGEX.match(snippet)
+        if days_ago_match is not None:
+            days_ago = int(days_ago_match.group(1))
+        else:
+            logger.warning("Error while parsing snippet: %s, setting days ago to 0", snippet)
             days_ago = 0
+        organic_result["_days_ago"] = days_ago
         return days_ago
 
-    def _add_keywords_to_query(self, query: str):
-        keyword_query = "|".join([f"{keyword}" for keyword in self.keywords])  # build OR chained string
-        keyword_query = keyword_query.replace("(", "")  # remove parenthesis
-        keyword_query = keyword_query.replace(")", "")  # remove parenthesis
-        keyword_query = keyword_query.replace(" AND ", " ")  # space correspond to AND in Google Scholar
-        keyword_query = keyword_query.replace("AND", " ")
-        keyword_query = keyword_query.replace(" OR ", "|")  # OR correspond to | in Google Scholar
-        keyword_query = keyword_query.replace("OR", "|")
-        keyword_query = keyword_query.replace("NOT ", "-")  # NOT correspond to - in Google Scholar
+    def _get_keywords_query(self) -> str:
+        keyword_query = "|".join(self.keywords)  # build OR chained string
+        keyword_query = keyword_query.translate(GS_REMOVE_PARENTHESES)  # remove parenthesis
+        # in a single pass, replace AND with space, OR with |, and NOT with - (Google Scholar syntax)
+        keyword_query = GS_OPERATORS_REGEX.sub(
+            lambda match: GS_OPERATORS[match.group(1) or "NOT"], keyword_query)
+        return keyword_query
 
+    def _add_keywords_to_query(self, query: str):
         if len(query) == 0:
-            return keyword_query
+            return self.keywords_query
         else:
-            return f"{query} {keyword_query}"
+            return f"{query} {self.keywords_query}"
+
+    @staticmethod
+    def _split_query(query: str, max_length: int = GS_MAX_QUERY_LENGTH) -> List[str]:
+        """
+        Split an OR chained query in chunks no longer than max_length, packing as many terms as possible in each
+        chunk (terms longer than max_length get a chunk of their own).
 
-    def make_query(self, query):
-        # divide the query in chunks
-        len_query = len(query)
-        query_frame = [0, 0]
-        frame_length = 255
+        :param query: query, with terms separated by '|'
+        :param max_length: max length of each chunk
+        :return: list of chunks
+        """
         query_list = []
-        for i, char in enumerate(query):
-            if char == '|':
-                query_frame[1] = i
-            if ((i % frame_length) == 0) and (i != 0):
-                query_list.append(query[query_frame[0]:query_frame[1]])
-                query_frame[0] = query_frame[1] + 1
-            if i == len_query - 1:
-                query_list.append(query[query_frame[0]:len_query])
-
-        # run each query
-        full_results = {}
-        logging.debug(f"Built query list: {query_list}")
-        for q in query_list:
-            logger.info(f"Running Google Scholar query: {q}")
-            query_params = {"q": q, **self.gs_parameters}  # get query parameters
-            r = requests.get(self.gs_base_url, params=query_params)  # make query
-            full_results.update(r.json())
-
-        # check for error
-        if "error" in full_results.keys():
-            logger.info(f"SerpAPI Google Scholar returned the following error: {full_results['error']}")
-            return {}
-
-        # return as json
-        return full_results
+        chunk_terms = []
+        chunk_length = -1  # length of the terms in the chunk, plus the '|' between them
+        for term in query.split("|"):
+            if chunk_terms and (chunk_length + 1 + len(term) > max_length):
+                query_list.append("|".join(chunk_terms))
+                chunk_terms, chunk_length = [], -1
+            chunk_terms.append(term)
+            chunk_length += 1 + len(term)
+        query_list.append("|".join(chunk_terms))
+        return query_list
+
+    def _run_query_chunk(self, query: str) -> List:
+        """
+        Run a single query (no longer than GS_MAX_QUERY_LENGTH) on Google Scholar and get its results published from
+        the initial date.
 
-    def _get_results_from_initial_date(self, results: Dict) -> List:
-        organic_results = results["organic_results"]  # get organic results
+        :param query: query
+        :return: list of organic results, or None if SerpAPI returned an error (other than no results)
+        """
+        logger.info("Running Google Scholar query: %s", query)
+        query_params = {"q": query, **self.gs_parameters}  # get query parameters
+        r = self.session.get(self.gs_base_url, params=query_params, timeout=HTTP_TIMEOUT)  # make query
+        results = json_loads(r.content)
+
+        # check for error; SerpAPI also reports queries without results as errors, which are successful queries
+        if "error" in results.keys():
+            if GS_NO_RESULTS_ERROR in results["error"]:
+                logger.info("No Google Scholar results for query: %s", query)
+                return []
+            logger.info("SerpAPI Google Scholar returned the following error: %s", results["error"])
+            return None
+
+        # get results published from the initial date, walking the next pages if needed
+        return self._get_results_from_initial_date(results)
+
+    def make_query(self, query) -> Tuple[List, bool]:
+        """
+        Run a query on Google Scholar, splitting it in chunks no longer than GS_MAX_QUERY_LENGTH, and merge the
+        results of the chunks.
+
+        :param query: query
+        :return: tuple (list of organic results published from the initial date, True if all the chunks succeeded)
+        """
+        # if the query is short enough, run it directly
+        if len(query) <= GS_MAX_QUERY_LENGTH:
+            results = self._run_query_chunk(query)
+            return ([], False) if results is None else (results, True)
+
+        # else, divide the query in chunks
+        query_list = self._split_query(query)
+
+        # run the queries concurrently, since they are bound by network latency, and merge their results in order
+        full_results = []
+        all_succeeded = True
+        logger.debug("Built query list: %s", query_list)
+        with ThreadPoolExecutor(max_workers=min(len(query_list), GS_MAX_WORKERS)) as executor:
+            for chunk_results in executor.map(self._run_query_chunk, query_list):
+                if chunk_results is None:
+                    all_succeeded = False
+                else:
+                    full_results.extend(chunk_results)
 
-        # get how many days ago the last paper on page was published
-        last_result_days_ago = self._get_days_ago_for_gs_organic_result(organic_results[-1])
+        return full_results, all_succeeded
 
-        # if latest paper on page was published earlier than self.timedelta_days, go to next page;
-        # else, get only the elements published earlier than self.timedelta_days days
-        if last_result_days_ago <= self.timedelta_days:
+    def _get_results_from_initial_date(self, results: Dict) -> List:
+        # init output list
+        output_list = []
+
+        # walk the pages of results until a paper published earlier than self.timedelta_days is found
+        while True:
+            organic_results = results.get("organic_results", [])  # get organic results
+            if len(organic_results) == 0:
+                break
+
+            # get how many days ago the last paper on page was published
+            last_result_days_ago = self._get_days_ago_for_gs_organic_result(organic_results[-1])
+
+            # if latest paper on page was published earlier than self.timedelta_days, get only the elements
+            # published earlier than self.timedelta_days days and stop; else, keep the page and go to the next one
+            if last_result_days_ago > self.timedelta_days:
+                output_list.extend(ores for ores in organic_results
+                                   if self._get_days_ago_for_gs_organic_result(ores) < self.timedelta_days)
+                break
+            output_list.extend(organic_results)
+
+            # stop if there are no more pages
+            next_page_url = results.get("serpapi_pagination", {}).get("next")
+            if next_page_url is None:
+                break
             logger.info("Searching next GS page")
-            r = requests.get(results["serpapi_pagination"]["next"], params={"api_key": self.serpapi_key})  # next page
-            next_results = r.json()
-            new_organic_results = self._get_results_from_initial_date(next_results)
-            return [*organic_results, *new_organic_results]
-        else:
-            output_list = [ores for ores in organic_results
-                           if self._get_days_ago_for_gs_organic_result(ores) < self.timedelta_days]
-            return output_list
-  
+            r = self.session.get(next_page_url, params={"api_key": self.serpapi_key}, timeout=HTTP_TIMEOUT)  # next page
+            results = json_loads(r.content)
+
+        return output_list
+
     def _get_output_list_from_query(self, query):
+        # check if the results for the query are cached (the results depend on the initial date, which is not part
+        # of Google Scholar queries, and on the current date)
+        if not self.cli_args.no_cache:
+            output_list = self.cache.get(self.name, query, self.initial_date, self.max_results_for_query,
+                                         self.today)
+            if output_list is not None:
+                logger.info("Using cached results (%s) for Google Scholar query: %s", len(output_list), query)
+                return output_list
+
         # init output list
         output_list = []
 
-        # make query
-        results = self.make_query(query)
-
-        if results != {}:
-            # get results published from the initial date
-            organic_results_from_initial_date = self._get_results_from_initial_date(results)
-          
-            # create list of results
-            for element in organic_results_from_initial_date:
-                # get authors
-                if "authors" in element["publication_info"]:
-                    authors = [a["name"] for a in element["publication_info"]["authors"]]
-                else:
-                    authors = [None]
-                # get date
-                days_ago = timedelta(days=self._get_days_ago_for_gs_organic_result(element))
-                publication_date = datetime.now() - days_ago
-                # get title
-                try:
-                    article_title = element["title"]
-                except KeyError as e:
-                    logger.warning(f"Error while parsing title for element: {element}, setting title to 'No title found'")
-                    article_title = "No title found"
-                # get link
-                try:
-                    article_link = element["link"]
-                except KeyError as e:
-                    logger.warning(f"Error while parsing link for element: {element}, setting link to 'None'")
-                    article_link = None
-                # get snippet
-                try:
-                    article_snippet = element["snippet"]
-                except KeyError as e:
-                    logger.warning(f"Error while parsing snippet for element: {element}, setting snippet to 'No snippet found'")
-                    article_snippet = "No snippet found"
-                # build dict for element
-                element_dict = self.article_dict(
-                    authors=authors,
-                    title=article_title,
-                    link=article_link,
-                    abstract=article_snippet,
-                    doi=None,
-                    journal=None,
-                    date=publication_date.strftime(DATE_FORMAT)
-                )
-                # append to output list
-                output_list.append(element_dict)
+        # make query, getting the results published from the initial date
+        organic_results_from_initial_date, all_succeeded = self.make_query(query)
+
+        # the publication dates are computed from the current date, and formatted once per days ago
+        date_str_for_days_ago = {}
+
+        # create list of results
+        for element in organic_results_from_initial_date:
+            # get authors
+            if "authors" in element["publication_info"]:
+                authors = [a["name"] for a in element["publication_info"]["authors"]]
+            else:
+                authors = [None]
+            # get date
+            days_ago = self._get_days_ago_for_gs_organic_result(element)
+            if days_ago not in date_str_for_days_ago:
+                date_str_for_days_ago[days_ago] = (self.now - timedelta(days=days_ago)).strftime(DATE_FORMAT)
+            # get title
+            try:
+                article_title = element["title"]
+            except KeyError as e:
+                logger.warning("Error while parsing title for element: %s, setting title to '%s'", element, NO_TITLE)
+                article_title = NO_TITLE
+            # get link
+            try:
+                article_link = element["link"]
+            except KeyError as e:
+                logger.warning("Error while parsing link for element: %s, setting link to 'None'", element)
+                article_link = None
+            # get snippet
+            try:
+                article_snippet = element["snippet"]
+            except KeyError as e:
+                logger.warning("Error while parsing snippet for element: %s, setting snippet to 'No snippet found'",
+                               element)
+                article_snippet = "No snippet found"
+            # build dict for element
+            element_dict = self.article_dict(
+                authors=authors,
+                title=article_title,
+                link=article_link,
+                abstract=article_snippet,
+                doi=None,
+                journal=None,
+                date=date_str_for_days_ago[days_ago]
+            )
+            # append to output list
+            output_list.append(element_dict)
+
+        # cache output list (only if all the queries succeeded)
+        if all_succeeded:
+            self.cache.set(output_list, self.name, query, self.initial_date, self.max_results_for_query,
+                           self.today)
 
         return output_list
     
@@ -464,7 +1021,7 @@ class GoogleScholarPipeline(EnginePipeline):
             return []
         else:
             # iterate on journals
-            query = "|".join([f"source:{j}" for j in self.journals])
+            query = "|".join(f"source:{j}" for j in self.journals)
             # if necessary, add keywords to the query
             if self.cli_args.filter_journals:
                 query = self._add_keywords_to_query(query)
@@ -481,15 +1038,14 @@ class GoogleScholarPipeline(EnginePipeline):
             # build the authors list in the format required by GS
             gs_authors_list = []
             for a in self.authors:
-                a_familiy_name:str  = a.split(',')[0]
-                a_given_name: str = a.split(',')[1]
+                a_familiy_name, a_given_name = a.split(',', maxsplit=1)
                 if a_given_name.isupper():
                     a_initials = a_given_name
                 else:
                     a_initials = a_given_name.replace(' ', '')[0]
                 gs_authors_list.append(f"{a_familiy_name} {a_initials}")
             # generate the query
-            query = "|".join([f"author:{a}" for a in gs_authors_list])
+            query = "|".join(f"author:{a}" for a in gs_authors_list)
             # if necessary, add keywords to the query
             if self.cli_args.filter_authors:
                 query = self._add_keywords_to_query(query)
@@ -499,53 +1055,66 @@ class GoogleScholarPipeline(EnginePipeline):
        
 
 class OutputGenerator:
-    def __init__(self, results: List, cli_args: argparse.Namespace, config: Dict) -> None:
+    def __init__(self, results: List, cli_args: argparse.Namespace, config: Dict, initial_date: str) -> None:
         # store results
         self.results = results
         # generate output folder
         OUT_FOLDER.mkdir(exist_ok=True)
-        # get initial date
-        if cli_args.from_date is None:
-            initial_date = datetime.now() - timedelta(weeks=cli_args.for_weeks)
-            self.initial_date = initial_date.strftime(DATE_FORMAT)
-        else:
-            self.initial_date = cli_args.from_date
+        # store initial date
+        self.initial_date = initial_date
+        # get final date once, so that all the sections of the report share it
+        self.final_date = datetime.now().strftime(DATE_FORMAT)
         # config
-        self.journals = config["journals"]
-        self.authors = config["authors"]
+        self.journals = list(dict.fromkeys(config["journals"]))
+        self.authors = list(dict.fromkeys(config["authors"]))
+        # build a new list, so that the config is not modified
         self.highlight_authors = config["highlight_authors"] + self.authors
+        # index the authors to highlight, so that each paper author is checked with a single lookup
+        self.highlight_authors_keys = {self._get_author_key(a) for a in self.highlight_authors}
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _get_author_key(author: str) -> Tuple[str, str]:
+        """
+        Get the key used to match an author with the authors to highlight, i.e. the lowercase last name and first
+        name initial. Accepts both the 'Lastname, Firstname' format (config file and PubMed) and the
+        'F Lastname' format (Google Scholar).
+
+        :param author: author name
+        :return: tuple (last name, first name initial)
+        """
+        if "," in author:
+            last_name, first_name = author.split(",", maxsplit=1)
+        else:
+            first_name, _, last_name = author.strip().rpartition(" ")
+        return last_name.strip().lower(), first_name.strip()[:1].lower()
 
     def to_json(self) -> None:
-        with open(OUT_JSON, "w") as outfile:
-            json.dump(self.results, outfile, indent=2)
+        with open(OUT_JSON, "wb") as outfile:
+            outfile.write(json_dumps(self.results, indent=True))
 
     def __paper_dict_to_html(self, paper_dict: Dict) -> str:
-        paper_html = ""  # init html
-
-        # 1. add paper title
-        paper_html += f'<p class="lorem" style="font-size: larger;"><strong>{paper_dict["title"]}</strong></p>\n'
-        # 2. add author
-        authors_string = f'{paper_dict["authors"][0]} et al. ({paper_dict["date"]})'
-        if None not in paper_dict["authors"]:
-            a_to_highlight = [a for a, ha in product(paper_dict["authors"], self.highlight_authors)
-                            if (a.split(",")[0] in ha.split(",")) and (a.split(",")[1][1] in ha)]
+        # 1. build authors string, escaping the names (the highlight markup is added by LiRA)
+        authors_string = f'{escape(str(paper_dict["authors"][0]))} et al. ({paper_dict["date"]})'
+        # skip the authors scan altogether when there is nobody to highlight
+        if self.highlight_authors_keys and (None not in paper_dict["authors"]):
+            a_to_highlight = [a for a in paper_dict["authors"] if self._get_author_key(a) in self.highlight_authors_keys]
             if a_to_highlight:
-                a_to_highlight_str = "; ".join(a_to_highlight)
+                a_to_highlight_str = escape("; ".join(a_to_highlight))
                 a_to_highlight_str = f'\t <span style="color: #ff0000">Notice: {a_to_highlight_str} in authors</span>'
                 authors_string += a_to_highlight_str
-        paper_html += f'<p class="lorem">{authors_string}</em><br>\n'
-        # 3. add link
-        paper_html += f'<a href="{paper_dict["link"]}"> {paper_dict["link"]}</a><br>\n'
-        # 4. add abstract
-        paper_html += f'{paper_dict["abstract"]}</p>\n'
-        paper_html += '<hr class="lorem">\n'
+        # 2. fill paper template with title, authors, link and abstract, escaping the fields returned by the engines
+        return PAPER_HTML_TEMPLATE % {"title": escape(str(paper_dict["title"]), quote=False),
+                                      "authors": authors_string,
+                                      "link": escape(str(paper_dict["link"])),
+                                      "abstract": escape(str(paper_dict["abstract"]), quote=False)}
 
-        return paper_html
+    def _generate_html_sections(self) -> Iterator[str]:
+        """
+        Lazily generate the html of the report body, one header or paper at a time.
 
-    def to_html(self) -> None:
-        # init output html
-        output_html_str = ""
-        
+        :return: iterator over html chunks
+        """
         # for each engine results
         for engine_dict in self.results:
             engine_name = engine_dict['engine']
@@ -557,81 +1126,201 @@ class OutputGenerator:
             for section in sections:
                 # generate results part for section
                 n_results = len(engine_dict['results'][section])
-                output_html_str += f"<h1>{section.capitalize()} results [{engine_dict['engine']}]" \
-                                f"({n_results}) " \
-                                f"({self.initial_date} - {datetime.now().strftime(DATE_FORMAT)})</h1>\n"
+                yield (f"<h1>{section.capitalize()} results [{engine_dict['engine']}]"
+                       f"({n_results}) "
+                       f"({self.initial_date} - {self.final_date})</h1>\n")
                 for paper_dict in engine_dict['results'][section]:
-                    output_html_str += self.__paper_dict_to_html(paper_dict)
-            
+                    yield self.__paper_dict_to_html(paper_dict)
+
             if (engine_name == "pubmed"):
-                for j in self.journals:
-                    results_for_j = [article for article in engine_dict['results']['journals'] if article['journal'] == j]
+                # group the results by journal in a single pass
+                results_by_journal = defaultdict(list)
+                for article in engine_dict['results']['journals']:
+                    results_by_journal[article['journal']].append(article)
+                # get journals in config, plus the ones which could not be matched to the config
+                unmatched_journals = sorted(j for j in results_by_journal if (j is not None) and (j not in self.journals))
+                for j in self.journals + unmatched_journals:
+                    results_for_j = results_by_journal.get(j, [])
                     n_results_for_j = len(results_for_j)
-                    output_html_str += f"<h1>{j.capitalize()} results [{engine_dict['engine']}]" \
-                                    f"({n_results_for_j}) " \
-                                    f"({self.initial_date} - {datetime.now().strftime(DATE_FORMAT)})</h1>\n"
+                    yield (f"<h1>{escape(j.capitalize())} results [{engine_dict['engine']}]"
+                           f"({n_results_for_j}) "
+                           f"({self.initial_date} - {self.final_date})</h1>\n")
                     for paper_dict in results_for_j:
-                        output_html_str += self.__paper_dict_to_html(paper_dict)
-                
-        # replace text in template
-        with open("in/template.html", "r") as infile:
-            template = infile.read()
-        literature_review_report = template.replace("TO_REPLACE", output_html_str)
-
-        # write report
-        with open(OUT_HTML, "w") as html_file:
+                        yield self.__paper_dict_to_html(paper_dict)
+
+    def to_html(self) -> None:
+        # get template split around the placeholder for the results
+        template_head, template_tail = load_template()
+
+        # write report, streaming the html sections to file instead of building the full report in memory
+        with open(OUT_HTML, "w", buffering=OUT_BUFFER_SIZE) as html_file:
             logger.info("Saving HTML report... ")
-            html_file.write(literature_review_report)
-            logger.info("Done.") 
+            html_file.write(template_head)
+            html_file.writelines(self._generate_html_sections())
+            html_file.write(template_tail)
+            logger.info("Done.")
+
+
+@lru_cache(maxsize=1)
+def load_template() -> Tuple[str, str]:
+    """
+    Read the html template once and split it around the placeholder for the results.
+
+    :return: tuple (template head, template tail)
+    """
+    with open(TEMPLATE_HTML, "r") as infile:
+        template = infile.read()
+    template_head, template_tail = template.split("TO_REPLACE", maxsplit=1)
+    return template_head, template_tail
+
+
+def get_article_keys(article: Dict) -> List[str]:
+    """
+    Get the keys identifying an article across sections and engines: its link and its DOI, when available.
+
+    :param article: article, as generated by EnginePipeline.article_dict
+    :return: list of keys
+    """
+    keys = []
+    if article["link"] is not None:
+        keys.append(f"link:{article['link']}")
+    if article["doi"] is not None:
+        keys.append(f"doi:{article['doi'].lower()}")
+    return keys
+
+
+def get_normalized_title(article: Dict) -> str:
+    """
+    Get the title of an article in lowercase and with alphanumeric characters only, so that the same article can be
+    recognized across engines (e.g. a Google Scholar result, which has no DOI, and the PubMed one).
+
+    :param article: article, as generated by EnginePipeline.article_dict
+    :return: normalized title, or None if the article has no title
+    """
+    if (article["title"] is None) or (article["title"] == NO_TITLE):
+        return None
+    normalized_title = NON_ALPHANUMERIC_REGEX.sub("", article["title"].lower())
+    return normalized_title if normalized_title else None
+
+
+def is_same_article_by_title(article: Dict, other_article: Dict) -> bool:
+    """
+    Check if two articles with the same title are the same article. The title is only used as a fallback to match a
+    PubMed article with a non-PubMed one (e.g. a Google Scholar result), when at least one of them has no DOI. Two
+    PubMed articles, or two non-PubMed ones, are only matched by link or DOI, since many distinct articles have
+    generic titles, such as 'Erratum.'.
+
+    :param article: article, as generated by EnginePipeline.article_dict
+    :param other_article: article with the same normalized title
+    :return: True if the articles are considered the same
+    """
+    if (article["doi"] is not None) and (other_article["doi"] is not None):
+        return False
+    is_pubmed = [(a["link"] is not None) and a["link"].startswith(PUBMED_ARTICLE_URL) for a in (article, other_article)]
+    return is_pubmed[0] != is_pubmed[1]
+
+
+def drop_seen_articles(articles: List[Dict], seen_keys: set, seen_titles: Dict[str, List[Dict]]) -> List[Dict]:
+    """
+    Drop the articles which have already been seen, i.e. with any key (see get_article_keys) in seen_keys, or with
+    the same title of a seen article and considered the same article (see is_same_article_by_title). The others are
+    added to seen_keys and seen_titles.
+
+    :param articles: list of articles, as generated by EnginePipeline.article_dict
+    :param seen_keys: set of keys of the articles already seen. It is updated in place.
+    :param seen_titles: dict mapping each normalized title to the articles already seen with that title. It is
+        updated in place.
+    :return: list of articles not seen before
+    """
+    new_articles = []
+    for article in articles:
+        article_keys = get_article_keys(article)
+        if any(key in seen_keys for key in article_keys):
+            continue
+        normalized_title = get_normalized_title(article)
+        if normalized_title is not None:
+            articles_with_title = seen_titles.setdefault(normalized_title, [])
+            if any(is_same_article_by_title(article, a) for a in articles_with_title):
+                continue
+            articles_with_title.append(article)
+        seen_keys.update(article_keys)
+        new_articles.append(article)
+    return new_articles
 
 
 def run_search(args):
     # read config
     config = read_config(args)
 
+    # get initial date once, so that all the engines and the report share it
+    initial_date = get_initial_date(args)
+
     # init engines
     engines_list: List[EnginePipeline] = []
     if "engine" in config.keys():
         if "pubmed" in config["engine"]:
-            engines_list.append(PubMedPipeline(args))
+            engines_list.append(PubMedPipeline(args, config, initial_date))
         if "google-scholar" in config["engine"]:
-            engines_list.append(GoogleScholarPipeline(args))
+            engines_list.append(GoogleScholarPipeline(args, config, initial_date))
     else:
-        engines_list.append(PubMedPipeline(args))
-        engines_list.append(GoogleScholarPipeline(args))
+        engines_list.append(PubMedPipeline(args, config, initial_date))
+        engines_list.append(GoogleScholarPipeline(args, config, initial_date))
 
     # init list of papers
     output_list = []
 
-    for engine in engines_list:
-        # Generate the 'general' part using keywords
-        if not args.suppress_general:
-            general_list = engine.search_for_keywords()
-        else:
-            general_list = []
-        # Generate the journals part
-        journal_list = engine.search_for_journals()
-        # Generate the authors part
-        authors_list = engine.search_for_authors()
-        # generate dict for engine
-        d = {
-            "engine": engine.name,
-            "results": {
-                "general": general_list,
-                "journals": journal_list,
-                "authors": authors_list
+    # run the searches of all engines concurrently, since they are bound by network latency (each engine has its own
+    # rate limits, so the engines do not slow each other down)
+    with ThreadPoolExecutor(max_workers=max(1, sum(engine.max_workers for engine in engines_list))) as executor:
+        # submit the searches of each engine
+        engines_futures = []
+        for engine in engines_list:
+            # Generate the 'general' part using keywords
+            if not args.suppress_general:
+                general_future = executor.submit(engine.search_for_keywords)
+            else:
+                general_future = None
+            # Generate the journals part
+            journal_future = executor.submit(engine.search_for_journals)
+            # Generate the authors part
+            authors_future = executor.submit(engine.search_for_authors)
+            engines_futures.append((engine, general_future, journal_future, authors_future))
+
+        # report each article once, in the first engine and section where it is found
+        seen_keys = set()
+        seen_titles = {}
+        for engine, general_future, journal_future, authors_future in engines_futures:
+            # get results
+            general_list = [] if general_future is None else general_future.result()
+            journal_list = journal_future.result()
+            authors_list = authors_future.result()
+            # drop the articles already reported, keeping track of how many they are
+            n_found = len(general_list) + len(journal_list) + len(authors_list)
+            general_list = drop_seen_articles(general_list, seen_keys, seen_titles)
+            journal_list = drop_seen_articles(journal_list, seen_keys, seen_titles)
+            authors_list = drop_seen_articles(authors_list, seen_keys, seen_titles)
+            n_duplicates = n_found - (len(general_list) + len(journal_list) + len(authors_list))
+            if n_duplicates > 0:
+                logger.info("Dropped %s of the %s %s results, since they were already reported",
+                            n_duplicates, n_found, engine.name)
+            # generate dict for engine
+            d = {
+                "engine": engine.name,
+                "results": {
+                    "general": general_list,
+                    "journals": journal_list,
+                    "authors": authors_list
+                }
             }
-        }
-        # append to output list
-        output_list.append(d)
-        
+            # append to output list
+            output_list.append(d)
 
     # check if literature review is empty
     if len(output_list) == 0:
-        logger.warning(f"LiRA output is empty.")
+        logger.warning("LiRA output is empty.")
 
     # get output generator
-    og = OutputGenerator(output_list, cli_args=args, config=config)
+    og = OutputGenerator(output_list, cli_args=args, config=config, initial_date=initial_date)
 
     # generate json
     og.to_json()
@@ -660,7 +1349,8 @@ def main():
     else:
         run_search(args)
 
-    # open result in browser
+    # open result in browser (importing the module only now, so that e.g. --help starts faster)
+    import webbrowser
     webbrowser.open(url=str(OUT_HTML.resolve()), new=0)
 
 